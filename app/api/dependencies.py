@@ -5,10 +5,18 @@ Dependencies in FastAPI are reusable functions that can be injected into routes.
 from typing import Optional
 from fastapi import Query, HTTPException, status
 
+from ..utils.pagination import decode_cursor
+
 
 def get_pagination_params(
-    skip: int = Query(0, ge=0, description="Number of items to skip"),
-    limit: int = Query(10, ge=1, le=100, description="Number of items to return")
+    skip: int = Query(
+        0, ge=0, deprecated=True,
+        description="Number of items to skip (deprecated, use cursor instead)"
+    ),
+    limit: int = Query(10, ge=1, le=100, description="Number of items to return"),
+    cursor: Optional[str] = Query(
+        None, description="Value of next_cursor from the previous page"
+    )
 ):
     """
     Common pagination parameters for list endpoints.
@@ -16,20 +24,18 @@ def get_pagination_params(
     Query parameters are automatically validated by FastAPI.
     - ge=0: greater than or equal to 0
     - le=100: less than or equal to 100
+    
+    The cursor is decoded into the sort key of the last item already seen
+    ("after"), so the next page starts right after it instead of walking
+    past `skip` rows.
     """
-    return {"skip": skip, "limit": limit}
-
-
-def validate_email_query(
-    email: str = Query(..., description="Email address to filter bookings")
-):
-    """
-    Validate email query parameter.
-    The '...' means this parameter is required.
-    """
-    if not email or len(email.strip()) == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email parameter is required and cannot be empty"
-        )
-    return email.strip().lower()
\ No newline at end of file
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+    return {"skip": skip, "limit": limit, "after": after}
@@ -1,15 +1,25 @@
 """
 API route definitions with comprehensive error handling.
 FastAPI uses Python type hints to validate requests and generate documentation.
+
+Endpoints that use the database are plain `def` functions: the SQLAlchemy session
+is synchronous, and FastAPI runs `def` endpoints in its threadpool, so a slow
+query doesn't block the event loop for every other request.
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
+from pydantic import EmailStr, TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from typing import List, Literal, Optional, Union
 
+from ..config import settings
 from ..database import get_db
 from .. import crud, schemas, models
-from .dependencies import get_pagination_params, validate_email_query
+from ..utils.cache import TTLCache
+from ..utils.pagination import encode_cursor
+from ..utils.timezone import utc_now
+from .dependencies import get_pagination_params
 
 
 # Create API router with prefix and tags for organization
@@ -19,39 +29,64 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Class listings only change when a booking succeeds, so serve repeated reads
+# from memory for a few seconds. Both caches are invalidated on booking.
+classes_cache = TTLCache(ttl=settings.classes_cache_ttl)
+class_details_cache = TTLCache(ttl=settings.class_details_cache_ttl)
+
+# List endpoints serialize their items with these adapters and return the
+# payload directly (response_model=None), so each item is validated at most
+# once instead of again by a wrapper model and by FastAPI's response check.
+_CLASS_LIST_ADAPTER = TypeAdapter(List[schemas.FitnessClassResponse])
+_BOOKING_LIST_ADAPTER = TypeAdapter(List[schemas.BookingResponse])
+
 
 # 1. GET /classes - Get all upcoming fitness classes
 @router.get(
     "/classes",
-    response_model=schemas.ClassListResponse,
+    response_model=None,
+    responses={200: {"model": schemas.ClassListResponse}},
     summary="Get upcoming fitness classes",
     description="Returns a list of all upcoming fitness classes with available slots"
 )
-async def get_classes(
+def get_classes(
     pagination: dict = Depends(get_pagination_params),
     db: Session = Depends(get_db)
 ):
     """
     Retrieve all upcoming fitness classes.
     
-    - **skip**: Number of classes to skip (for pagination)
     - **limit**: Maximum number of classes to return (max 100)
+    - **cursor**: `next_cursor` from the previous page, to fetch the next one
+    - **skip**: Number of classes to skip (deprecated, use cursor instead)
     
     Returns classes sorted by date/time in ascending order.
     """
     try:
-        # Get upcoming classes from database
-        classes = crud.get_upcoming_classes(
-            db, 
-            skip=pagination["skip"], 
-            limit=pagination["limit"]
-        )
+        cache_key = (pagination["skip"], pagination["limit"], pagination["after"])
+        classes = classes_cache.get(cache_key)
         
-        # Return structured response
-        return schemas.ClassListResponse(
-            total=len(classes),
-            classes=classes
-        )
+        if classes is None:
+            # Get upcoming classes from database
+            classes = crud.get_upcoming_classes(
+                db, 
+                skip=pagination["skip"], 
+                limit=pagination["limit"],
+                after=pagination["after"]
+            )
+            classes_cache.set(cache_key, classes)
+        
+        # A full page means there may be more classes after the last one
+        next_cursor = None
+        if classes and len(classes) == pagination["limit"]:
+            next_cursor = encode_cursor(classes[-1].datetime_ist, classes[-1].id)
+        
+        # Return structured response (same shape as ClassListResponse)
+        return ORJSONResponse({
+            "total": len(classes),
+            "classes": _CLASS_LIST_ADAPTER.dump_python(classes, mode="json"),
+            "next_cursor": next_cursor
+        })
         
     except Exception as e:
         # Log the error (in production, use proper logging)
@@ -65,13 +100,16 @@ async def get_classes(
 # 2. POST /book - Create a new booking
 @router.post(
     "/book",
-    response_model=schemas.BookingResponse,
+    response_model=Union[schemas.BookingResponse, schemas.BookingCreatedResponse],
     status_code=status.HTTP_201_CREATED,
     summary="Book a fitness class",
     description="Create a new booking for a fitness class if slots are available"
 )
-async def create_booking(
+def create_booking(
     booking_data: schemas.BookingCreate,
+    expand: Optional[Literal["class"]] = Query(
+        None, description='Set to "class" to include the booked class details'
+    ),
     db: Session = Depends(get_db)
 ):
     """
@@ -82,25 +120,28 @@ async def create_booking(
     - Slots are available
     - Client hasn't already booked this class
     
-    Returns the created booking with class details.
+    Returns the booking id, class id and booking time. With **expand=class**
+    the full booking is returned, including client and class details.
     """
     # Step 1: Validate class exists
-    fitness_class = crud.get_class_by_id(db, booking_data.class_id)
-    if not fitness_class:
+    # (the class row is locked and its booking count fetched with it)
+    preflight = crud.get_booking_preflight(db, booking_data.class_id)
+    if not preflight:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Class with ID {booking_data.class_id} not found"
         )
+    fitness_class = preflight.fitness_class
     
     # Step 2: Check if class is upcoming (not in the past)
-    if fitness_class.datetime_utc < datetime.utcnow():
+    if fitness_class.datetime_utc < utc_now():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot book a class that has already started or ended"
         )
     
     # Step 3: Check available slots
-    if fitness_class.available_slots <= 0:
+    if preflight.booked_count >= fitness_class.total_slots:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail={
@@ -110,26 +151,32 @@ async def create_booking(
             }
         )
     
-    # Step 4: Check for duplicate booking
-    email_normalized = booking_data.client_email.lower()
-    if crud.check_existing_booking(db, booking_data.class_id, email_normalized):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={
-                "error": "You have already booked this class",
-                "class_name": fitness_class.name,
-                "client_email": email_normalized
-            }
-        )
-    
-    # Step 5: Create the booking
+    # Step 4: Create the booking
+    # Duplicate bookings are rejected by the unique constraint on
+    # (class_id, client_email), so no separate lookup is needed
+    # (the detail is built up front: rollback expires fitness_class)
+    duplicate_detail = {
+        "error": "You have already booked this class",
+        "class_name": fitness_class.name,
+        "client_email": booking_data.client_email
+    }
     try:
-        # Normalize email to lowercase for consistency
-        booking_data.client_email = email_normalized
-        new_booking = crud.create_booking(db, booking_data)
+        new_booking = crud.create_booking(db, booking_data, fitness_class)
         
-        return new_booking
+        # Slot counts changed, so cached listings are now stale
+        classes_cache.clear()
+        class_details_cache.delete(booking_data.class_id)
         
+        if expand == "class":
+            return schemas.BookingResponse.model_validate(new_booking)
+        return schemas.BookingCreatedResponse.model_validate(new_booking)
+        
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=duplicate_detail
+        )
     except Exception as e:
         # Rollback is handled automatically by SQLAlchemy
         print(f"Error creating booking: {str(e)}")
@@ -142,12 +189,13 @@ async def create_booking(
 # 3. GET /bookings - Get bookings by email
 @router.get(
     "/bookings",
-    response_model=schemas.BookingListResponse,
+    response_model=None,
+    responses={200: {"model": schemas.BookingListResponse}},
     summary="Get bookings by email",
     description="Returns all bookings made by a specific email address"
 )
-async def get_bookings(
-    email: str = Depends(validate_email_query),
+def get_bookings(
+    email: EmailStr = Query(..., description="Email address to filter bookings"),
     db: Session = Depends(get_db)
 ):
     """
@@ -157,22 +205,19 @@ async def get_bookings(
     
     Returns bookings sorted by booking date (newest first).
     """
+    # Emails are stored lowercased (see BookingCreate)
+    email = email.lower()
+    
     try:
-        # Normalize email for consistent querying
-        email_normalized = email.lower()
-        
         # Get bookings from database
-        bookings = crud.get_bookings_by_email(db, email_normalized)
+        bookings = crud.get_bookings_by_email(db, email)
         
-        # Return structured response
-        return schemas.BookingListResponse(
-            total=len(bookings),
-            bookings=bookings
-        )
+        # Return structured response (same shape as BookingListResponse)
+        return ORJSONResponse({
+            "total": len(bookings),
+            "bookings": _BOOKING_LIST_ADAPTER.dump_python(bookings, mode="json")
+        })
         
-    except HTTPException:
-        # Re-raise HTTP exceptions (from validate_email_query)
-        raise
     except Exception as e:
         print(f"Error fetching bookings: {str(e)}")
         raise HTTPException(
@@ -184,19 +229,22 @@ async def get_bookings(
 # Health check endpoint
 @router.get(
     "/health",
-    response_model=schemas.MessageResponse,
+    response_model=None,
+    responses={200: {"model": schemas.MessageResponse}},
     summary="Health check",
     description="Check if the API is running"
 )
 async def health_check():
     """Simple health check endpoint for monitoring."""
-    return schemas.MessageResponse(
-        message="API is healthy",
-        details={
+    # Only the timestamp changes between calls, so skip building and
+    # validating a MessageResponse and encode the body directly
+    return ORJSONResponse({
+        "message": "API is healthy",
+        "details": {
             "status": "online",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": utc_now().isoformat()
         }
-    )
+    })
 
 
 # Optional: Add endpoint to get single class details
@@ -206,11 +254,15 @@ async def health_check():
     summary="Get class details",
     description="Get details of a specific fitness class"
 )
-async def get_class_details(
+def get_class_details(
     class_id: int,
     db: Session = Depends(get_db)
 ):
     """Get detailed information about a specific fitness class."""
+    cached = class_details_cache.get(class_id)
+    if cached is not None:
+        return cached
+    
     fitness_class = crud.get_class_by_id(db, class_id)
     
     if not fitness_class:
@@ -219,4 +271,6 @@ async def get_class_details(
             detail=f"Class with ID {class_id} not found"
         )
     
-    return fitness_class
\ No newline at end of file
+    class_details = schemas.FitnessClassResponse.model_validate(fitness_class)
+    class_details_cache.set(class_id, class_details)
+    return class_details
\ No newline at end of file
@@ -4,7 +4,7 @@ This allows environment variables to override defaults.
 """
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-import pytz
+from zoneinfo import ZoneInfo
 
 
 class Settings(BaseSettings):
@@ -16,6 +16,13 @@ class Settings(BaseSettings):
     
     # Database settings
     database_url: str = "sqlite:///./fitness_booking.db"
+    # Skip creating tables on startup (e.g. when the schema is managed by Alembic)
+    skip_create_all: bool = False
+    
+    # Connection pool settings (ignored for SQLite)
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800  # seconds
     
     # Timezone settings - IST (Indian Standard Time)
     timezone: str = "Asia/Kolkata"
@@ -23,6 +30,10 @@ class Settings(BaseSettings):
     # API settings
     api_v1_prefix: str = "/api/v1"
     
+    # Response cache lifetimes in seconds (0 disables caching)
+    classes_cache_ttl: int = 10
+    class_details_cache_ttl: int = 60
+    
     class Config:
         env_file = ".env"
 
@@ -40,4 +51,4 @@ def get_settings() -> Settings:
 settings = get_settings()
 
 # Create timezone object for IST
-IST = pytz.timezone(settings.timezone)
\ No newline at end of file
+IST = ZoneInfo(settings.timezone)
\ No newline at end of file
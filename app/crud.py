@@ -2,33 +2,82 @@
 CRUD (Create, Read, Update, Delete) operations.
 This module contains all database operations, keeping them separate from API logic.
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, tuple_
 from datetime import datetime
 from . import models, schemas
-from typing import List, Optional
+from .utils.timezone import datetime_to_ist, utc_now
+from typing import List, NamedTuple, Optional, Tuple
 
 
-def get_upcoming_classes(db: Session, skip: int = 0, limit: int = 100) -> List[models.FitnessClass]:
+class BookingPreflight(NamedTuple):
+    """Result of the lookup done before creating a booking"""
+    fitness_class: models.FitnessClass
+    booked_count: int
+
+
+def get_upcoming_classes(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, int]] = None
+) -> List[schemas.FitnessClassResponse]:
     """
     Get all upcoming fitness classes (classes scheduled after current time).
     
+    Booked counts are computed in the same query (LEFT OUTER JOIN + GROUP BY),
+    so listing classes never loads the individual booking rows. Only plain
+    column values are selected, so no ORM objects are built for the classes
+    either: the IST conversion and slot count are done right here.
+    
     Args:
         db: Database session
-        skip: Number of records to skip (for pagination)
+        skip: Number of records to skip (deprecated offset pagination)
         limit: Maximum number of records to return
+        after: (datetime_utc, id) of the last class already returned; only
+            classes sorted after it are fetched (keyset pagination)
     
     Returns:
-        List of upcoming fitness classes
+        List of upcoming fitness classes, ready to be returned by the API
     """
-    current_time_utc = datetime.utcnow()
+    current_time_utc = utc_now()
     
-    return db.query(models.FitnessClass)\
+    query = db.query(
+            models.FitnessClass.id,
+            models.FitnessClass.name,
+            models.FitnessClass.instructor,
+            models.FitnessClass.datetime_utc,
+            models.FitnessClass.total_slots,
+            func.count(models.Booking.id).label("booked")
+        )\
+        .outerjoin(models.Booking)\
         .filter(models.FitnessClass.datetime_utc > current_time_utc)\
-        .order_by(models.FitnessClass.datetime_utc)\
+        .group_by(models.FitnessClass.id)
+    
+    if after is not None:
+        query = query.filter(
+            tuple_(models.FitnessClass.datetime_utc, models.FitnessClass.id) > tuple_(*after)
+        )
+    
+    # id breaks ties between classes starting at the same time, so the
+    # (datetime_utc, id) sort key is unique and pages never overlap
+    rows = query\
+        .order_by(models.FitnessClass.datetime_utc, models.FitnessClass.id)\
         .offset(skip)\
         .limit(limit)\
         .all()
+    
+    return [
+        schemas.FitnessClassResponse(
+            id=row.id,
+            name=row.name,
+            instructor=row.instructor,
+            datetime_ist=datetime_to_ist(row.datetime_utc),
+            available_slots=row.total_slots - row.booked,
+            total_slots=row.total_slots
+        )
+        for row in rows
+    ]
 
 
 def get_class_by_id(db: Session, class_id: int) -> Optional[models.FitnessClass]:
@@ -36,60 +85,124 @@ def get_class_by_id(db: Session, class_id: int) -> Optional[models.FitnessClass]
     return db.query(models.FitnessClass).filter(models.FitnessClass.id == class_id).first()
 
 
-def create_booking(db: Session, booking: schemas.BookingCreate) -> models.Booking:
+def get_booking_preflight(db: Session, class_id: int) -> Optional[BookingPreflight]:
+    """
+    Fetch everything needed to validate a booking: the class itself and how
+    many bookings it has. No booking rows are loaded.
+    
+    Duplicate bookings aren't looked up here; the unique constraint on
+    (class_id, client_email) rejects them when the booking is inserted.
+    
+    The class row is locked (SELECT ... FOR UPDATE) so concurrent bookings
+    for the same class wait for each other. The bookings are counted in a
+    second statement, after the lock is held: under READ COMMITTED a count
+    taken in the locking statement itself would come from the snapshot
+    before the wait and miss a booking committed meanwhile. SQLite ignores
+    FOR UPDATE, so there the database write lock is taken up front
+    (BEGIN IMMEDIATE) instead.
+    
+    Args:
+        db: Database session
+        class_id: ID of the fitness class
+    
+    Returns:
+        BookingPreflight, or None if the class doesn't exist
+    """
+    connection = db.connection()
+    if connection.dialect.name == "sqlite" and not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    
+    fitness_class = db.query(models.FitnessClass)\
+        .filter(models.FitnessClass.id == class_id)\
+        .with_for_update()\
+        .first()
+    
+    if fitness_class is None:
+        return None
+    
+    booked = db.query(func.count(models.Booking.id))\
+        .filter(models.Booking.class_id == class_id)\
+        .scalar()
+    return BookingPreflight(fitness_class, booked)
+
+
+def create_booking(
+    db: Session,
+    booking: schemas.BookingCreate,
+    fitness_class: Optional[models.FitnessClass] = None
+) -> models.Booking:
     """
     Create a new booking.
     
     Args:
         db: Database session
         booking: Booking data from request
+        fitness_class: The already-loaded class being booked, if available;
+            attached directly so reading booking.fitness_class needs no query
     
     Returns:
         Created booking object
     
-    Note: This doesn't check for available slots - that should be done in the API layer
+    Note: This doesn't check for available slots - that should be done in the API layer.
+    Duplicate bookings raise IntegrityError (unique constraint on class_id + client_email).
     """
     db_booking = models.Booking(**booking.model_dump())
+    if fitness_class is not None:
+        db_booking.fitness_class = fitness_class
     db.add(db_booking)
+    # The generated id is read back from the INSERT itself, and sessions don't
+    # expire objects on commit, so no extra SELECT is needed to refresh it
     db.commit()
-    db.refresh(db_booking)  # Refresh to get the generated ID and relationships
     return db_booking
 
 
-def get_bookings_by_email(db: Session, email: str) -> List[models.Booking]:
+def get_bookings_by_email(db: Session, email: str) -> List[schemas.BookingResponse]:
     """
     Get all bookings for a specific email address.
     
+    The booked classes are batch-loaded with a SELECT ... IN query instead of
+    one query per booking. Their booked counts come from a single grouped
+    query (GROUP BY class_id), so the other clients' bookings are never
+    loaded just to be counted.
+    
     Args:
         db: Database session
         email: Client's email address
     
     Returns:
-        List of bookings for the email
+        List of bookings for the email, ready to be returned by the API
     """
-    return db.query(models.Booking)\
+    bookings = db.query(models.Booking)\
+        .options(selectinload(models.Booking.fitness_class))\
         .filter(models.Booking.client_email == email)\
         .order_by(models.Booking.booked_at.desc())\
         .all()
-
-
-def check_existing_booking(db: Session, class_id: int, email: str) -> bool:
-    """
-    Check if a client has already booked a specific class.
     
-    Args:
-        db: Database session
-        class_id: ID of the fitness class
-        email: Client's email address
+    if not bookings:
+        return []
     
-    Returns:
-        True if booking exists, False otherwise
-    """
-    existing = db.query(models.Booking)\
-        .filter(and_(
-            models.Booking.class_id == class_id,
-            models.Booking.client_email == email
-        ))\
-        .first()
+    booked_counts = dict(
+        db.query(models.Booking.class_id, func.count(models.Booking.id))
+        .filter(models.Booking.class_id.in_({booking.class_id for booking in bookings}))
+        .group_by(models.Booking.class_id)
+        .all()
+    )
     
-    return existing is not None
\ No newline at end of file
+    return [
+        schemas.BookingResponse(
+            id=booking.id,
+            class_id=booking.class_id,
+            client_name=booking.client_name,
+            client_email=booking.client_email,
+            booked_at_ist=booking.booked_at_ist,
+            fitness_class=schemas.FitnessClassResponse(
+                id=booking.fitness_class.id,
+                name=booking.fitness_class.name,
+                instructor=booking.fitness_class.instructor,
+                datetime_ist=booking.fitness_class.datetime_ist,
+                available_slots=booking.fitness_class.total_slots - booked_counts[booking.class_id],
+                total_slots=booking.fitness_class.total_slots
+            )
+        )
+        for booking in bookings
+    ]
\ No newline at end of file
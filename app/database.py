@@ -2,20 +2,71 @@
 Database configuration using SQLAlchemy ORM.
 SQLAlchemy provides a pythonic way to interact with databases.
 """
-from sqlalchemy import create_engine
+from functools import lru_cache
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from .config import settings
 
-# Create database engine
-# check_same_thread=False is needed for SQLite to work with FastAPI
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
 
-# SessionLocal class will be used to create database sessions
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _engine_options(database_url: str) -> dict:
+    """
+    Build connection pool options for the configured database.
+    SQLite needs check_same_thread=False to work with FastAPI; other databases
+    get a sized pool that recycles and pings connections before use.
+    """
+    if "sqlite" in database_url:
+        options = {"connect_args": {"check_same_thread": False}}
+        if ":memory:" in database_url or database_url == "sqlite://":
+            # An in-memory database only exists inside its connection,
+            # so every session has to share that single connection
+            options["poolclass"] = StaticPool
+        return options
+    
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets readers (e.g. GET /classes) run while a booking is being written,
+    and synchronous=NORMAL is safe with WAL while avoiding an fsync per commit.
+    SQLite also only enforces foreign keys (and ON DELETE CASCADE) when asked.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+@lru_cache()
+def get_engine() -> Engine:
+    """
+    Create the database engine on first use.
+    The @lru_cache decorator ensures we create only one engine, and nothing
+    connects to the database just because this module was imported.
+    """
+    engine = create_engine(settings.database_url, **_engine_options(settings.database_url))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+@lru_cache()
+def get_sessionmaker() -> sessionmaker:
+    """
+    Session factory bound to the engine, used to create database sessions.
+    Sessions live for a single request, so objects are kept loaded after commit
+    (expire_on_commit=False) instead of being re-fetched on the next access.
+    """
+    return sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=get_engine())
 
 # Base class for our models
 Base = declarative_base()
@@ -27,7 +78,7 @@ def get_db():
     The 'yield' keyword makes this a generator function.
     The 'finally' block ensures the session is closed after the request.
     """
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
@@ -3,13 +3,15 @@ Main FastAPI application setup.
 This is the entry point for our API.
 """
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
 
 from .config import settings
-from .database import engine, Base
+from .database import get_engine, Base
+from . import schemas  # noqa: F401 - imported eagerly so all validators are built before serving
 from .api import routes
 
 # Configure logging
@@ -19,10 +21,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-logger.info("Database tables created/verified")
-
 # Create FastAPI instance
 app = FastAPI(
     title=settings.app_name,
@@ -30,6 +28,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",  # Swagger UI
     redoc_url="/redoc",  # ReDoc UI
+    default_response_class=ORJSONResponse,  # orjson encodes datetimes natively and much faster
 )
 
 # Add CORS middleware (configure based on your needs)
@@ -56,7 +55,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
             "type": error["type"]
         })
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "detail": "Validation error",
@@ -85,6 +84,11 @@ app.include_router(routes.router)
 @app.on_event("startup")
 async def startup_event():
     """Run startup tasks."""
+    if not settings.skip_create_all:
+        # Create database tables in a worker thread so the event loop isn't blocked
+        await asyncio.to_thread(Base.metadata.create_all, bind=get_engine())
+        logger.info("Database tables created/verified")
+    
     logger.info(f"{settings.app_name} started")
     logger.info(f"Timezone: {settings.timezone}")
     logger.info(f"Database: {settings.database_url}")
@@ -106,7 +110,7 @@ async def global_exception_handler(request: Request, exc: Exception):
     """
     logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "detail": "An unexpected error occurred. Please try again later."
@@ -2,12 +2,10 @@
 SQLAlchemy ORM models define our database structure.
 Each class represents a table in the database.
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy.orm import relationship, object_session
 from .database import Base
-from datetime import datetime
-import pytz
-from .config import IST
+from .utils.timezone import datetime_to_ist, utc_now
 
 
 class FitnessClass(Base):
@@ -19,30 +17,43 @@ class FitnessClass(Base):
     instructor = Column(String, nullable=False)
     
     # Store datetime in UTC in database, convert to IST when needed
-    datetime_utc = Column(DateTime, nullable=False)
+    # Indexed because upcoming classes are filtered and sorted by it
+    datetime_utc = Column(DateTime, nullable=False, index=True)
     
     # Total slots available for this class
     total_slots = Column(Integer, nullable=False)
     
     # Relationship to bookings (one-to-many)
-    bookings = relationship("Booking", back_populates="fitness_class", cascade="all, delete-orphan")
+    # Deleting a class removes its bookings through the foreign key's ON DELETE
+    # CASCADE, so the ORM never has to load the collection just to delete it;
+    # bookings that are already loaded are deleted by the ORM cascade
+    bookings = relationship(
+        "Booking",
+        back_populates="fitness_class",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
     
     @property
     def datetime_ist(self):
         """Convert UTC datetime to IST for display"""
         if self.datetime_utc:
-            # If datetime is naive (no timezone), assume it's UTC
-            if self.datetime_utc.tzinfo is None:
-                utc_dt = pytz.UTC.localize(self.datetime_utc)
-            else:
-                utc_dt = self.datetime_utc
-            return utc_dt.astimezone(IST)
+            return datetime_to_ist(self.datetime_utc)
         return None
     
     @property
     def available_slots(self):
         """Calculate available slots by subtracting bookings from total"""
-        return self.total_slots - len(self.bookings)
+        session = object_session(self)
+        if "bookings" in self.__dict__ or session is None:
+            # Collection is already loaded (or we're detached), just count it
+            return self.total_slots - len(self.bookings)
+        
+        # Count in SQL instead of loading every booking row
+        booked = session.query(func.count(Booking.id))\
+            .filter(Booking.class_id == self.id)\
+            .scalar()
+        return self.total_slots - booked
     
     def __repr__(self):
         return f"<FitnessClass {self.name} on {self.datetime_ist}>"
@@ -51,14 +62,20 @@ class FitnessClass(Base):
 class Booking(Base):
     """Model for client bookings"""
     __tablename__ = "bookings"
+    __table_args__ = (
+        # A client can book a given class only once; enforced by the database
+        # so concurrent requests can't both slip past an application check.
+        # The constraint's index also serves (class_id, client_email) lookups.
+        UniqueConstraint("class_id", "client_email", name="uq_booking_class_email"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    class_id = Column(Integer, ForeignKey("fitness_classes.id"), nullable=False)
+    class_id = Column(Integer, ForeignKey("fitness_classes.id", ondelete="CASCADE"), nullable=False)
     client_name = Column(String, nullable=False)
-    client_email = Column(String, nullable=False, index=True)  # Index for faster queries
+    client_email = Column(String, nullable=False, index=True)  # Index for lookups by email alone
     
     # Timestamp when booking was made (UTC)
-    booked_at = Column(DateTime, default=datetime.utcnow)
+    booked_at = Column(DateTime, default=utc_now)
     
     # Relationship to fitness class (many-to-one)
     fitness_class = relationship("FitnessClass", back_populates="bookings")
@@ -67,11 +84,7 @@ class Booking(Base):
     def booked_at_ist(self):
         """Convert booking timestamp to IST"""
         if self.booked_at:
-            if self.booked_at.tzinfo is None:
-                utc_dt = pytz.UTC.localize(self.booked_at)
-            else:
-                utc_dt = self.booked_at
-            return utc_dt.astimezone(IST)
+            return datetime_to_ist(self.booked_at)
         return None
     
     def __repr__(self):
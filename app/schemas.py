@@ -2,7 +2,7 @@
 Pydantic schemas for request/response validation.
 These ensure data integrity and provide automatic documentation.
 """
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, field_validator
 from datetime import datetime
 from typing import Optional, List
 
@@ -14,6 +14,12 @@ class BookingCreate(BaseModel):
     client_name: str = Field(..., min_length=1, max_length=100, description="Client's full name")
     client_email: EmailStr = Field(..., description="Client's email address")
     
+    @field_validator("client_email", mode="after")
+    @classmethod
+    def normalize_email(cls, value: str) -> str:
+        """Store and compare emails in lowercase, normalized once while parsing"""
+        return value.lower()
+    
     model_config = ConfigDict(
         # This creates example data for API documentation
         json_schema_extra={
@@ -56,6 +62,15 @@ class BookingResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class BookingCreatedResponse(BaseModel):
+    """Minimal response for a new booking (use ?expand=class for class details)"""
+    id: int
+    class_id: int
+    booked_at_ist: datetime = Field(..., description="Booking timestamp in IST")
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
 class MessageResponse(BaseModel):
     """Generic message response for status messages"""
     message: str
@@ -67,9 +82,28 @@ class ClassListResponse(BaseModel):
     """Response containing list of classes"""
     total: int
     classes: List[FitnessClassResponse]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to fetch the next page; null on the last page"
+    )
 
 
 class BookingListResponse(BaseModel):
     """Response containing list of bookings"""
     total: int
-    bookings: List[BookingResponse]
\ No newline at end of file
+    bookings: List[BookingResponse]
+
+
+# Make sure every schema's validator is fully built at import time, so an
+# unresolved type fails at startup rather than on the first request.
+# (This is a no-op for schemas that pydantic already completed.)
+for _schema in (
+    BookingCreate,
+    FitnessClassResponse,
+    BookingResponse,
+    BookingCreatedResponse,
+    MessageResponse,
+    ClassListResponse,
+    BookingListResponse,
+):
+    _schema.model_rebuild(raise_errors=True)
+del _schema
\ No newline at end of file
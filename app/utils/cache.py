@@ -0,0 +1,67 @@
+"""
+Small in-process cache with time-based expiry for read-heavy endpoints.
+"""
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe key/value cache whose entries expire after `ttl` seconds.
+    A ttl of 0 (or less) disables caching entirely.
+
+    At most `maxsize` entries are kept: expired entries are swept out on
+    every write, and if the cache is still full the oldest entry is evicted.
+
+    Each worker process has its own cache, so entries can be stale for up to
+    `ttl` seconds after a change made through another process.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value for `ttl` seconds"""
+        if self.ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            # Re-inserting moves the key to the end, so entries stay in the order
+            # they were written - which, with a single ttl, is also expiry order
+            self._entries.pop(key, None)
+            while self._entries:
+                oldest = next(iter(self._entries))
+                if self._entries[oldest][0] > now and len(self._entries) < self.maxsize:
+                    break
+                del self._entries[oldest]
+            self._entries[key] = (now + self.ttl, value)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a single entry (no-op if it isn't cached)"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,31 @@
+"""
+Cursor helpers for keyset pagination.
+A cursor is an opaque, URL-safe token wrapping the (datetime_utc, id) sort key
+of the last item on a page.
+"""
+import base64
+from datetime import datetime, timezone
+from typing import Tuple
+
+
+def encode_cursor(dt: datetime, item_id: int) -> str:
+    """Build a cursor pointing just after the item with this sort key"""
+    if dt.tzinfo is not None:
+        # Sort keys are compared against naive UTC values in the database
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    raw = f"{dt.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Turn a cursor back into its (naive UTC datetime, id) sort key.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        dt_string, item_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(dt_string), int(item_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
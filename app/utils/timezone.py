@@ -1,25 +1,29 @@
 """
 Timezone utility functions for handling IST conversions.
 """
-from datetime import datetime
-import pytz
+from datetime import datetime, timezone
 from ..config import IST
 
 
+def utc_now() -> datetime:
+    """Current UTC time as a naive datetime, matching how timestamps are stored"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 def datetime_to_ist(dt: datetime) -> datetime:
     """Convert any datetime to IST"""
     if dt.tzinfo is None:
         # Assume naive datetime is UTC
-        dt = pytz.UTC.localize(dt)
+        dt = dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(IST)
 
 
 def ist_to_utc(dt: datetime) -> datetime:
     """Convert IST datetime to UTC for storage"""
     if dt.tzinfo is None:
-        # Localize to IST first
-        dt = IST.localize(dt)
-    return dt.astimezone(pytz.UTC)
+        # Attach IST first
+        dt = dt.replace(tzinfo=IST)
+    return dt.astimezone(timezone.utc)
 
 
 def parse_ist_string(dt_string: str) -> datetime:
@@ -29,5 +33,5 @@ def parse_ist_string(dt_string: str) -> datetime:
     """
     dt = datetime.fromisoformat(dt_string.replace('Z', '+00:00'))
     if dt.tzinfo is None:
-        dt = IST.localize(dt)
-    return dt.astimezone(pytz.UTC)
\ No newline at end of file
+        dt = dt.replace(tzinfo=IST)
+    return dt.astimezone(timezone.utc)
\ No newline at end of file
@@ -9,26 +9,30 @@ from pathlib import Path
 # Add project root to Python path
 sys.path.append(str(Path(__file__).parent))
 
-from app.database import SessionLocal, engine, Base
+from app.database import get_engine, get_sessionmaker, Base
 from app.models import FitnessClass
 from app.utils.timezone import ist_to_utc
 from app.config import IST
 
 # Ensure tables exist
-Base.metadata.create_all(bind=engine)
+Base.metadata.create_all(bind=get_engine())
 
 
 def create_sample_classes():
     """Create sample fitness classes for testing."""
-    db = SessionLocal()
+    db = get_sessionmaker()()
     
     try:
-        # Clear existing data
+        # Clear existing data (committed together with the new rows below,
+        # so a failed seed leaves the old data in place)
         db.query(FitnessClass).delete()
-        db.commit()
         
-        # Get current time in IST
-        now_ist = datetime.now(IST)
+        # Start of today in IST, computed once; every class is an offset from it
+        today_ist = datetime.now(IST).replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        def class_time(days: int, hour: int, minute: int = 0):
+            """UTC start time of a class `days` from today at hour:minute IST"""
+            return ist_to_utc(today_ist + timedelta(days=days, hours=hour, minutes=minute))
         
         # Sample classes data
         sample_classes = [
@@ -36,47 +40,45 @@ def create_sample_classes():
             {
                 "name": "Morning Yoga",
                 "instructor": "Priya Sharma",
-                "datetime_utc": ist_to_utc(now_ist.replace(hour=6, minute=30, second=0, microsecond=0) + timedelta(days=1)),
+                "datetime_utc": class_time(1, 6, 30),
                 "total_slots": 20
             },
             {
                 "name": "HIIT Workout",
                 "instructor": "Raj Kumar",
-                "datetime_utc": ist_to_utc(now_ist.replace(hour=7, minute=30, second=0, microsecond=0) + timedelta(days=1)),
+                "datetime_utc": class_time(1, 7, 30),
                 "total_slots": 15
             },
             # Tomorrow's classes
             {
                 "name": "Evening Zumba",
                 "instructor": "Anita Desai",
-                "datetime_utc": ist_to_utc(now_ist.replace(hour=18, minute=0, second=0, microsecond=0) + timedelta(days=2)),
+                "datetime_utc": class_time(2, 18),
                 "total_slots": 25
             },
             {
                 "name": "Power Yoga",
                 "instructor": "Priya Sharma",
-                "datetime_utc": ist_to_utc(now_ist.replace(hour=19, minute=30, second=0, microsecond=0) + timedelta(days=2)),
+                "datetime_utc": class_time(2, 19, 30),
                 "total_slots": 20
             },
             # Weekend classes
             {
                 "name": "Weekend HIIT",
                 "instructor": "Raj Kumar",
-                "datetime_utc": ist_to_utc(now_ist.replace(hour=8, minute=0, second=0, microsecond=0) + timedelta(days=3)),
+                "datetime_utc": class_time(3, 8),
                 "total_slots": 30
             },
             {
                 "name": "Relaxation Yoga",
                 "instructor": "Priya Sharma",
-                "datetime_utc": ist_to_utc(now_ist.replace(hour=17, minute=0, second=0, microsecond=0) + timedelta(days=3)),
+                "datetime_utc": class_time(3, 17),
                 "total_slots": 25
             },
         ]
         
-        # Create class instances
-        for class_data in sample_classes:
-            fitness_class = FitnessClass(**class_data)
-            db.add(fitness_class)
+        # Insert all rows in one batch, skipping per-object ORM bookkeeping
+        db.bulk_insert_mappings(FitnessClass, sample_classes)
         
         # Commit all changes
         db.commit()
@@ -0,0 +1,208 @@
+"""
+Shared pytest fixtures.
+Tests run against an in-memory SQLite database, so nothing touches the disk.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import event, insert, select
+
+# Configure the app for testing before it is imported anywhere.
+# An in-memory URL makes app.database use a single shared connection (StaticPool),
+# and the fixtures below manage the schema instead of the startup event.
+# Every pytest-xdist worker is its own process, so each one gets a private database.
+# Set TEST_DATABASE_URL (e.g. sqlite:///./test.db) to inspect the data in a file instead.
+test_database_url = os.environ.get("TEST_DATABASE_URL", "sqlite://")
+if (
+    os.environ.get("PYTEST_XDIST_WORKER")
+    and test_database_url.startswith("sqlite:///")
+    and ":memory:" not in test_database_url
+):
+    # One file per worker, so parallel runs don't share a database
+    test_database_url += "." + os.environ["PYTEST_XDIST_WORKER"]
+os.environ["DATABASE_URL"] = test_database_url
+os.environ["SKIP_CREATE_ALL"] = "true"
+
+from app.main import app as application
+from app.api.routes import classes_cache, class_details_cache
+from app.config import IST
+from app.database import Base, get_db, get_engine, get_sessionmaker
+from app.models import FitnessClass, Booking
+from app.utils.timezone import ist_to_utc
+
+# Nothing has connected yet: the engine is created here, from the settings above
+engine = get_engine()
+SessionLocal = get_sessionmaker()
+
+
+# pysqlite doesn't emit BEGIN itself until the first write, which breaks
+# SAVEPOINTs; let SQLAlchemy start transactions explicitly instead
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+# Test data is thrown away, so a file-backed test database doesn't need to
+# survive a crash: skip fsyncs and keep the rollback journal in memory.
+# (journal_mode=OFF would be faster still, but then ROLLBACK - which every
+# test relies on - stops working.)
+@event.listens_for(engine, "connect")
+def _disable_sqlite_durability(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+    cursor.close()
+
+
+@event.listens_for(engine, "begin")
+def _begin_transaction(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+# Stand-in for the generated OpenAPI document, which no test checks
+_OPENAPI_STUB = {"openapi": "3.1.0", "info": {"title": "test", "version": "0"}, "paths": {}}
+
+
+@pytest.fixture(scope="session", name="app")
+def app_fixture():
+    """
+    The FastAPI application under test. Its OpenAPI schema is stubbed out,
+    so an incidental /openapi.json or /docs request doesn't build the real one.
+    """
+    application.openapi_schema = _OPENAPI_STUB
+    yield application
+    application.openapi_schema = None
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """One event loop for the whole run, so session-scoped async fixtures can use it."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+async def aclient(app):
+    """
+    Async HTTP client shared by the whole run. Requests go straight to the app
+    through ASGITransport, without the thread and portal TestClient puts in
+    between. The app's startup and shutdown events run once around the run.
+    """
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+
+@pytest.fixture(scope="session")
+def setup_database(app):
+    """
+    Open the single connection used by the whole run and create the tables on it.
+    Tests never connect or disconnect: sessions are leased from this connection
+    and isolated with SAVEPOINTs, so SQLite's page cache stays warm throughout.
+    Everything happens inside one outer transaction that is rolled back at
+    the end, so data created here (e.g. sample_classes) is shared by all tests.
+    
+    API requests get their own session on this connection; it joins whatever
+    transaction is active, so commits made by the API only release a SAVEPOINT.
+    """
+    connection = engine.connect()
+    Base.metadata.create_all(bind=connection)
+    connection.commit()
+    transaction = connection.begin()
+
+    def override_get_db():
+        db = SessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    yield connection
+
+    app.dependency_overrides.pop(get_db, None)
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(autouse=True)
+def db_session(setup_database):
+    """
+    Create a database session for tests. Each test runs inside a SAVEPOINT
+    that is rolled back afterwards, so bookings made by one test never leak
+    into the next.
+    """
+    savepoint = setup_database.begin_nested()
+    session = SessionLocal(bind=setup_database, join_transaction_mode="create_savepoint")
+
+    yield session
+
+    session.close()
+    savepoint.rollback()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Cached class listings must not leak between tests."""
+    classes_cache.clear()
+    class_details_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def base_times():
+    """Start times (UTC) for the sample classes: tomorrow and the day after."""
+    now_ist = datetime.now(IST)
+    return (
+        ist_to_utc(now_ist + timedelta(days=1)),
+        ist_to_utc(now_ist + timedelta(days=2)),
+    )
+
+
+@pytest.fixture(scope="session")
+def sample_classes(setup_database, base_times):
+    """
+    Create sample fitness classes for testing.
+    They are inserted once, in the outer transaction shared by all tests.
+    """
+    # Joins the outer transaction directly, so the rows stay when it closes
+    session = SessionLocal(bind=setup_database)
+    tomorrow, day_after = base_times
+
+    # A single Core INSERT (executemany); the rows don't need to be built as ORM objects
+    session.execute(insert(FitnessClass), [
+        {
+            "name": "Test Yoga",
+            "instructor": "Test Instructor",
+            "datetime_utc": tomorrow,
+            "total_slots": 10
+        },
+        {
+            "name": "Test HIIT",
+            "instructor": "Test Trainer",
+            "datetime_utc": day_after,
+            "total_slots": 1  # Only 1 slot for testing full booking
+        }
+    ])
+    classes = session.scalars(select(FitnessClass).order_by(FitnessClass.id)).all()
+    session.close()
+
+    return classes
+
+
+@pytest.fixture
+def make_booking(db_session):
+    """Insert a booking directly, for tests that only need it to exist."""
+    def _make_booking(class_id, client_name, client_email):
+        booking = Booking(class_id=class_id, client_name=client_name, client_email=client_email)
+        db_session.add(booking)
+        db_session.flush()
+        return booking
+
+    return _make_booking
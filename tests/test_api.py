@@ -1,223 +1,287 @@
 """
-Basic API tests using pytest and FastAPI's test client.
+Basic API tests using pytest and an async HTTPX client.
 Run with: pytest tests/test_api.py -v
 """
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from datetime import datetime, timedelta
-import sys
-from pathlib import Path
-
-# Add project root to path
-sys.path.append(str(Path(__file__).parent.parent))
-
-from app.main import app
-from app.database import Base, engine, SessionLocal
-from app.models import FitnessClass
-from app.utils.timezone import ist_to_utc
-from app.config import IST
-
-
-# Create test client
-client = TestClient(app)
-
-
-@pytest.fixture(scope="module")
-def setup_database():
-    """Create test database and tables."""
-    Base.metadata.create_all(bind=engine)
-    yield
-    # Cleanup after tests
-    Base.metadata.drop_all(bind=engine)
-
-
-@pytest.fixture
-def db_session():
-    """Create a database session for tests."""
-    connection = engine.connect()
-    transaction = connection.begin()
-    session = SessionLocal(bind=connection)
-    
-    yield session
-    
-    session.close()
-    transaction.rollback()
-    connection.close()
-
-
-@pytest.fixture
-def sample_classes(db_session):
-    """Create sample fitness classes for testing."""
-    now_ist = datetime.now(IST)
-    
-    classes = [
-        FitnessClass(
-            name="Test Yoga",
-            instructor="Test Instructor",
-            datetime_utc=ist_to_utc(now_ist + timedelta(days=1)),
-            total_slots=10
-        ),
-        FitnessClass(
-            name="Test HIIT",
-            instructor="Test Trainer",
-            datetime_utc=ist_to_utc(now_ist + timedelta(days=2)),
-            total_slots=1  # Only 1 slot for testing full booking
-        )
-    ]
-    
-    for cls in classes:
-        db_session.add(cls)
-    db_session.commit()
-    
-    return classes
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import FitnessClass, Booking
+from app import crud, schemas
+from app.utils.cache import TTLCache
+
+
+# Request body shared by the booking tests; each test fills in the class_id
+_BOOKING = {"class_id": None, "client_name": "John Doe", "client_email": "john@example.com"}
+
+
+def pjson(response):
+    """Decode a JSON response body (orjson, same as the app uses to encode it)"""
+    return orjson.loads(response.content)
+
+
+def assert_subset(got, expected):
+    """Check several fields at once; on failure pytest shows both dicts side by side"""
+    assert {key: got.get(key) for key in expected} == expected
 
 
 class TestHealthCheck:
     """Test health check endpoint."""
     
-    def test_health_check(self):
-        response = client.get("/api/v1/health")
+    async def test_health_check(self, aclient):
+        response = await aclient.get("/api/v1/health")
         assert response.status_code == 200
-        data = response.json()
-        assert data["message"] == "API is healthy"
+        data = pjson(response)
+        assert_subset(data, {"message": "API is healthy"})
+        assert_subset(data["details"], {"status": "online"})
         assert "timestamp" in data["details"]
 
 
 class TestGetClasses:
     """Test GET /classes endpoint."""
     
-    def test_get_classes_empty(self, setup_database):
-        response = client.get("/api/v1/classes")
+    async def test_get_classes_empty(self, aclient, setup_database, db_session):
+        # Sample classes may already exist; remove them for this test only
+        db_session.query(FitnessClass).delete()
+        db_session.commit()
+        
+        response = await aclient.get("/api/v1/classes")
         assert response.status_code == 200
-        data = response.json()
-        assert data["total"] == 0
-        assert data["classes"] == []
+        assert_subset(pjson(response), {"total": 0, "classes": []})
     
-    def test_get_classes_with_data(self, setup_database, sample_classes):
-        response = client.get("/api/v1/classes")
+    async def test_get_classes_with_data(self, aclient, setup_database, sample_classes):
+        response = await aclient.get("/api/v1/classes")
         assert response.status_code == 200
-        data = response.json()
+        data = pjson(response)
         assert data["total"] == 2
         assert len(data["classes"]) == 2
         
         # Check first class
-        first_class = data["classes"][0]
-        assert first_class["name"] == "Test Yoga"
-        assert first_class["available_slots"] == 10
+        assert_subset(data["classes"][0], {"name": "Test Yoga", "available_slots": 10})
     
-    def test_get_classes_pagination(self, setup_database, sample_classes):
+    async def test_get_classes_pagination(self, aclient, setup_database, sample_classes):
         # Test with limit
-        response = client.get("/api/v1/classes?limit=1")
+        response = await aclient.get("/api/v1/classes?limit=1")
         assert response.status_code == 200
-        data = response.json()
+        data = pjson(response)
         assert len(data["classes"]) == 1
         
         # Test with skip
-        response = client.get("/api/v1/classes?skip=1")
+        response = await aclient.get("/api/v1/classes?skip=1")
         assert response.status_code == 200
-        data = response.json()
+        data = pjson(response)
         assert len(data["classes"]) == 1
         assert data["classes"][0]["name"] == "Test HIIT"
+    
+    async def test_get_classes_cursor_pagination(self, aclient, setup_database, sample_classes):
+        response = await aclient.get("/api/v1/classes?limit=1")
+        assert response.status_code == 200
+        data = pjson(response)
+        assert data["classes"][0]["name"] == "Test Yoga"
+        assert data["next_cursor"]
+        
+        response = await aclient.get(f"/api/v1/classes?limit=1&cursor={data['next_cursor']}")
+        assert response.status_code == 200
+        data = pjson(response)
+        assert len(data["classes"]) == 1
+        assert data["classes"][0]["name"] == "Test HIIT"
+    
+    async def test_get_classes_invalid_cursor(self, aclient, setup_database):
+        response = await aclient.get("/api/v1/classes?cursor=not-a-cursor")
+        assert response.status_code == 400
+    
+    async def test_get_classes_cache_invalidated_by_booking(self, aclient, setup_database, sample_classes):
+        response = await aclient.get("/api/v1/classes")
+        assert pjson(response)["classes"][0]["available_slots"] == 10
+        
+        await aclient.post("/api/v1/book", json={**_BOOKING, "class_id": sample_classes[0].id})
+        
+        response = await aclient.get("/api/v1/classes")
+        assert pjson(response)["classes"][0]["available_slots"] == 9
 
 
 class TestCreateBooking:
     """Test POST /book endpoint."""
     
-    def test_create_booking_success(self, setup_database, sample_classes):
-        booking_data = {
-            "class_id": sample_classes[0].id,
-            "client_name": "John Doe",
-            "client_email": "john@example.com"
-        }
+    async def test_create_booking_success(self, aclient, setup_database, sample_classes):
+        booking_data = {**_BOOKING, "class_id": sample_classes[0].id}
         
-        response = client.post("/api/v1/book", json=booking_data)
-        assert response.status_code == 201
-        data = response.json()
-        assert data["client_name"] == "John Doe"
-        assert data["client_email"] == "john@example.com"
-        assert data["fitness_class"]["name"] == "Test Yoga"
-    
-    def test_create_booking_class_not_found(self, setup_database):
-        booking_data = {
-            "class_id": 9999,
-            "client_name": "John Doe",
-            "client_email": "john@example.com"
-        }
-        
-        response = client.post("/api/v1/book", json=booking_data)
-        assert response.status_code == 404
-        assert "not found" in response.json()["detail"]
-    
-    def test_create_booking_duplicate(self, setup_database, sample_classes):
-        booking_data = {
-            "class_id": sample_classes[0].id,
-            "client_name": "John Doe",
-            "client_email": "john@example.com"
-        }
-        
-        # First booking should succeed
-        response = client.post("/api/v1/book", json=booking_data)
+        response = await aclient.post("/api/v1/book", json=booking_data)
         assert response.status_code == 201
+        data = pjson(response)
+        assert_subset(data, {"class_id": sample_classes[0].id})
+        assert "id" in data
+        assert "booked_at_ist" in data
+        assert "fitness_class" not in data
+    
+    async def test_create_booking_expand_class(self, aclient, setup_database, sample_classes):
+        booking_data = {**_BOOKING, "class_id": sample_classes[0].id}
         
-        # Second booking should fail
-        response = client.post("/api/v1/book", json=booking_data)
-        assert response.status_code == 409
-        assert "already booked" in response.json()["detail"]["error"]
-    
-    def test_create_booking_full_class(self, setup_database, sample_classes):
-        # Book the only available slot
-        booking_data = {
-            "class_id": sample_classes[1].id,  # HIIT class with 1 slot
-            "client_name": "First User",
-            "client_email": "first@example.com"
-        }
-        response = client.post("/api/v1/book", json=booking_data)
+        response = await aclient.post("/api/v1/book?expand=class", json=booking_data)
         assert response.status_code == 201
+        data = pjson(response)
+        assert_subset(data, {"client_name": "John Doe", "client_email": "john@example.com"})
+        assert_subset(data["fitness_class"], {"name": "Test Yoga", "available_slots": 9})
+    
+    @pytest.mark.parametrize(
+        "class_index, client_email, existing_email, expected_status, expected_fragment",
+        [
+            (None, "john@example.com", None, 404, "not found"),
+            (0, "invalid-email", None, 422, "email"),
+            (0, "john@example.com", "john@example.com", 409, "already booked"),
+            (1, "second@example.com", "first@example.com", 409, "fully booked"),  # HIIT has 1 slot
+        ],
+        ids=["class_not_found", "invalid_email", "duplicate", "full_class"]
+    )
+    async def test_create_booking_errors(
+        self, aclient, setup_database, sample_classes, make_booking,
+        class_index, client_email, existing_email, expected_status, expected_fragment
+    ):
+        class_id = 9999 if class_index is None else sample_classes[class_index].id
+        
+        # Make the booking that should cause the conflict, if any
+        if existing_email:
+            make_booking(class_id, "First User", existing_email)
         
-        # Try to book when full
-        booking_data["client_email"] = "second@example.com"
-        response = client.post("/api/v1/book", json=booking_data)
-        assert response.status_code == 409
-        assert "fully booked" in response.json()["detail"]["error"]
+        response = await aclient.post(
+            "/api/v1/book", json={**_BOOKING, "class_id": class_id, "client_email": client_email}
+        )
+        assert response.status_code == expected_status
+        assert expected_fragment in str(pjson(response))
     
-    def test_create_booking_invalid_email(self, setup_database, sample_classes):
-        booking_data = {
-            "class_id": sample_classes[0].id,
-            "client_name": "John Doe",
-            "client_email": "invalid-email"
-        }
+    def test_booking_unique_per_class_and_email(self, setup_database, sample_classes, make_booking):
+        # Duplicates are rejected by the database, not by a lookup in the route
+        make_booking(sample_classes[0].id, "Jane Doe", "jane@example.com")
+        with pytest.raises(IntegrityError):
+            make_booking(sample_classes[0].id, "Jane Again", "jane@example.com")
+    
+    def test_concurrent_bookings_never_overbook(self, tmp_path, base_times):
+        # The shared test connection would serialize these bookings, so race
+        # them on a file database with one connection per thread instead
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'race.db'}",
+            connect_args={"check_same_thread": False, "timeout": 30}
+        )
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            fitness_class = FitnessClass(
+                name="Test Spin", instructor="Test Instructor", datetime_utc=base_times[0], total_slots=3
+            )
+            db.add(fitness_class)
+            db.commit()
+            class_id = fitness_class.id
         
-        response = client.post("/api/v1/book", json=booking_data)
-        assert response.status_code == 422
-        assert "email" in str(response.json()["errors"])
+        clients = 10
+        barrier = threading.Barrier(clients)
+        
+        def book(n):
+            # Same steps as POST /book: preflight, check the slots, insert
+            with Session() as db:
+                barrier.wait()
+                preflight = crud.get_booking_preflight(db, class_id)
+                if preflight.booked_count >= preflight.fitness_class.total_slots:
+                    db.rollback()
+                    return
+                crud.create_booking(db, schemas.BookingCreate(
+                    class_id=class_id, client_name=f"Client {n}", client_email=f"client{n}@example.com"
+                ))
+        
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            list(pool.map(book, range(clients)))
+        
+        with Session() as db:
+            assert db.query(Booking).filter(Booking.class_id == class_id).count() == 3
+        engine.dispose()
 
 
 class TestGetBookings:
     """Test GET /bookings endpoint."""
     
-    def test_get_bookings_by_email(self, setup_database, sample_classes):
+    async def test_get_bookings_by_email(self, aclient, setup_database, sample_classes, make_booking):
         # Create a booking first
-        booking_data = {
-            "class_id": sample_classes[0].id,
-            "client_name": "Jane Doe",
-            "client_email": "jane@example.com"
-        }
-        client.post("/api/v1/book", json=booking_data)
+        make_booking(sample_classes[0].id, "Jane Doe", "jane@example.com")
         
         # Get bookings
-        response = client.get("/api/v1/bookings?email=jane@example.com")
+        response = await aclient.get("/api/v1/bookings?email=jane@example.com")
         assert response.status_code == 200
-        data = response.json()
+        data = pjson(response)
         assert data["total"] == 1
-        assert data["bookings"][0]["client_email"] == "jane@example.com"
+        assert_subset(data["bookings"][0], {"client_email": "jane@example.com", "class_id": sample_classes[0].id})
+    
+    def test_get_bookings_preloads_classes(self, setup_database, sample_classes, db_session, make_booking):
+        make_booking(sample_classes[0].id, "Jane Doe", "jane@example.com")
+        make_booking(sample_classes[0].id, "John Doe", "john@example.com")
+        
+        bookings = crud.get_bookings_by_email(db_session, "jane@example.com")
+        
+        # Detach everything: the responses must already hold all their data,
+        # including slots taken by other clients' bookings
+        db_session.expunge_all()
+        assert bookings[0].fitness_class.name == "Test Yoga"
+        assert bookings[0].fitness_class.available_slots == 8
     
-    def test_get_bookings_no_email(self, setup_database):
-        response = client.get("/api/v1/bookings")
+    @pytest.mark.parametrize(
+        "query",
+        ["", "?email=not-an-email"],
+        ids=["no_email", "invalid_email"]
+    )
+    async def test_get_bookings_bad_email(self, aclient, setup_database, query):
+        response = await aclient.get(f"/api/v1/bookings{query}")
         assert response.status_code == 422
     
-    def test_get_bookings_empty_result(self, setup_database):
-        response = client.get("/api/v1/bookings?email=nonexistent@example.com")
+    async def test_get_bookings_empty_result(self, aclient, setup_database):
+        response = await aclient.get("/api/v1/bookings?email=nonexistent@example.com")
         assert response.status_code == 200
-        data = response.json()
-        assert data["total"] == 0
-        assert data["bookings"] == []
\ No newline at end of file
+        assert_subset(pjson(response), {"total": 0, "bookings": []})
+
+
+class TestModels:
+    """Test ORM model behaviour."""
+    
+    @pytest.mark.parametrize("load_bookings", [True, False], ids=["loaded", "not_loaded"])
+    def test_delete_class_deletes_bookings(self, setup_database, sample_classes, db_session, make_booking, load_bookings):
+        make_booking(sample_classes[0].id, "Jane Doe", "jane@example.com")
+        fitness_class = db_session.get(FitnessClass, sample_classes[0].id)
+        if load_bookings:
+            # A loaded collection is deleted by the ORM cascade...
+            assert len(fitness_class.bookings) == 1
+        # ...otherwise the foreign key's ON DELETE CASCADE removes the rows
+        
+        db_session.delete(fitness_class)
+        db_session.commit()
+        
+        assert db_session.query(Booking).filter(Booking.class_id == sample_classes[0].id).count() == 0
+
+
+class TestTTLCache:
+    """Test the in-memory cache used by the class endpoints."""
+    
+    def test_evicts_oldest_entry_when_full(self):
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        
+        assert len(cache) == 2
+        assert cache.get("a") is None
+        assert (cache.get("b"), cache.get("c")) == (2, 3)
+    
+    def test_set_sweeps_expired_entries(self, monkeypatch):
+        cache = TTLCache(ttl=10)
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+        for page in range(5):
+            cache.set(page, [])
+        
+        monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+        cache.set("fresh", [])
+        
+        assert len(cache) == 1
\ No newline at end of file